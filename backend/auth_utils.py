@@ -1,3 +1,5 @@
+import asyncio
+
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
@@ -22,6 +24,21 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt занимает ~100 мс CPU: считаем хеши в пуле потоков, чтобы не блокировать
+# event loop, и ограничиваем число одновременных вычислений числом ядер
+_hash_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    async with _hash_semaphore:
+        return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    async with _hash_semaphore:
+        return await asyncio.to_thread(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
 
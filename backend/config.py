@@ -9,3 +9,22 @@ PORT: int = int(os.getenv("PORT", "8000"))
 # Хост для запуска сервера
 HOST: str = os.getenv("HOST", "0.0.0.0")
 
+
+# Время жизни кэша проверенных JWT-токенов в секундах (0 — кэш выключен)
+AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", "0"))
+
+# Максимальное количество токенов в кэше
+AUTH_CACHE_MAXSIZE: int = int(os.getenv("AUTH_CACHE_MAXSIZE", "10000"))
+
+# Время жизни кэша ответов /stats в секундах (0 — кэш выключен)
+STATS_CACHE_TTL: int = int(os.getenv("STATS_CACHE_TTL", "0"))
+
+# Максимальное количество закэшированных ответов /stats
+STATS_CACHE_MAXSIZE: int = int(os.getenv("STATS_CACHE_MAXSIZE", "10000"))
+
+# Настройки пула соединений с БД. По умолчанию NullPool — для развёртываний
+# за пулером в режиме transaction (например, pgbouncer); DB_POOL_SIZE>0 включает QueuePool
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "0"))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
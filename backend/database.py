@@ -4,6 +4,8 @@ from typing import AsyncGenerator
 import os
 from dotenv import load_dotenv
 from sqlalchemy.pool import NullPool
+from sqlalchemy import text
+from config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
 
 try:
     from models import Base
@@ -14,13 +16,27 @@ except ImportError:
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+
+if DB_POOL_SIZE > 0:
+    pool_kwargs = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,  # Проверять соединение перед выдачей из пула
+        "pool_use_lifo": True,  # Переиспользовать последние соединения, лишние простаивают и закрываются
+    }
+else:
+    pool_kwargs = {"poolclass": NullPool}
+
 engine = create_async_engine(
     DATABASE_URL + "?prepared_statement_cache_size=0",
-    poolclass=NullPool,
     connect_args={
         "statement_cache_size": 0,
     },
     echo=True,
+    insertmanyvalues_page_size=500,  # Размер пачки строк в одном INSERT при массовой вставке
+    **pool_kwargs,
 )
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -31,6 +47,8 @@ AsyncSessionLocal = async_sessionmaker(
 
 async def init_db():
     async with engine.begin() as conn:
+        # Расширение для триграммного GIN-индекса поиска по задачам
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
     print("База данных инициализирована!")
 
@@ -1,21 +1,87 @@
+import asyncio
+import hashlib
+
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 from database import get_async_session
-from models.user import User, UserRole
+from models.user import User
 from auth_utils import decode_access_token
-from typing import Optional
+from config import AUTH_CACHE_TTL, AUTH_CACHE_MAXSIZE
+from typing import Annotated, Any, Dict, Optional
 
 # OAuth2 схема для получения токена из заголовка Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v3/auth/login")
 
+# Сессия БД как зависимость обработчика: `db: DBDep`
+DBDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+# Кэш проверенных токенов: sha256(token) -> снимок полей User.
+# Включается переменной окружения AUTH_CACHE_TTL (в секундах).
+_auth_cache: Optional[TTLCache] = (
+    TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL)
+    if AUTH_CACHE_TTL > 0
+    else None
+)
+# Блокировки на время промаха, чтобы один и тот же токен не проверялся параллельно
+_auth_locks: Dict[bytes, asyncio.Lock] = {}
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def _user_snapshot(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "nickname": user.nickname,
+        "email": user.email,
+        "hashed_password": user.hashed_password,
+        "role": user.role,
+    }
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Удаляет из кэша все токены пользователя (например, после смены пароля)."""
+    if _auth_cache is None:
+        return
+    for key, snapshot in list(_auth_cache.items()):
+        if snapshot["id"] == user_id:
+            _auth_cache.pop(key, None)
+
 
 # Аутентификация
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_async_session),
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: DBDep,
 ) -> User:
+    if _auth_cache is None:
+        return await _load_user_from_token(token, db)
+
+    key = _token_key(token)
+    cached = _auth_cache.get(key)
+    if cached is None:
+        lock = _auth_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                cached = _auth_cache.get(key)
+                if cached is None:
+                    user = await _load_user_from_token(token, db)
+                    _auth_cache[key] = _user_snapshot(user)
+                    return user
+        finally:
+            _auth_locks.pop(key, None)
+
+    # Восстанавливаем пользователя из снимка и привязываем к сессии без SELECT
+    user = User(**cached)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def _load_user_from_token(token: str, db: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Не удалось проверить учетные данные",
@@ -43,11 +109,15 @@ async def get_current_user(
     return user
 
 
+# Текущий пользователь как зависимость обработчика: `current_user: UserDep`
+UserDep = Annotated[User, Depends(get_current_user)]
+
+
 # Авторизация — проверка, что пользователь является администратором
 async def get_current_admin(
-    current_user: User = Depends(get_current_user),
+    current_user: UserDep,
 ) -> User:
-    if current_user.role != UserRole.ADMIN:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Недостаточно прав доступа",
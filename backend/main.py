@@ -1,11 +1,13 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import init_db, get_async_session
+from database import init_db
 from routers import tasks, stats, auth
+from dependencies import DBDep
 
 from scheduler import start_scheduler
 
@@ -41,8 +43,12 @@ app = FastAPI(
         "name": "Антон Саранцев",
     },
     lifespan=lifespan,  # Подключаем lifespan
+    default_response_class=ORJSONResponse,  # Быстрая сериализация JSON через orjson
 )
 
+# Сжатие ответов (списки задач) размером от 1 КБ
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Подключение роутеров к приложению
 app.include_router(tasks.router, prefix="/api/v3")
 app.include_router(stats.router, prefix="/api/v3")
@@ -62,7 +68,7 @@ async def read_root() -> dict:
 
 @app.get("/health")
 async def health_check(
-    db: AsyncSession = Depends(get_async_session),
+    db: DBDep,
 ) -> dict:
     """
     Проверка здоровья API и динамическая проверка подключения к БД.
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -73,6 +73,26 @@ class Task(Base):
     )
 
 
+# Текст для поиска по задачам: название + описание.
+# По этому же выражению построен GIN-индекс (pg_trgm), поэтому ILIKE '%...%' идёт через индекс
+TASK_SEARCH_TEXT = Task.title + " " + func.coalesce(Task.description, "")
+
+Index("ix_tasks_user_deadline", Task.user_id, Task.deadline_at)
+Index("ix_tasks_user_quadrant", Task.user_id, Task.quadrant)
+Index("ix_tasks_user_completed", Task.user_id, Task.completed)
+
+# Для статистики админа по всем задачам (без фильтра по user_id)
+Index("ix_tasks_completed_deadline", Task.completed, Task.deadline_at)
+Index("ix_tasks_quadrant", Task.quadrant)
+
+Index(
+    "ix_tasks_search_trgm",
+    TASK_SEARCH_TEXT.label("search_text"),
+    postgresql_using="gin",
+    postgresql_ops={"search_text": "gin_trgm_ops"},
+)
+
+
 def __repr__(self) -> str:
     return f"<Task(id={self.id}, title='{self.title}', quadrant='{self.quadrant}')>"
 
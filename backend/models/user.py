@@ -53,6 +53,11 @@ class User(Base):
         cascade="all, delete-orphan",  # Удалять задачи при удалении пользователя
     )
 
+    @property
+    def is_admin(self) -> bool:
+        # Сравнение членов Enum по идентичности, без обращения к .value
+        return self.role is UserRole.ADMIN
+
     def __repr__(self):
         return f"<User(id={self.id}, nickname='{self.nickname}', role='{self.role.value}')>"
 
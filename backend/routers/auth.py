@@ -1,15 +1,13 @@
-from typing import Dict, List
+from typing import Annotated, Dict, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select
+from sqlalchemy import func, or_, select
 
-from database import get_async_session
 from models.tasks import Task
 from models.user import User, UserRole
 from schemas_auth import UserCreate, UserResponse, Token
-from auth_utils import verify_password, get_password_hash, create_access_token
-from dependencies import get_current_user
+from auth_utils import verify_password_async, get_password_hash_async, create_access_token
+from dependencies import DBDep, UserDep, invalidate_user_cache
 
 router = APIRouter(
     prefix="/auth",
@@ -24,23 +22,26 @@ router = APIRouter(
 )
 async def register(
     user_data: UserCreate,
-    db: AsyncSession = Depends(get_async_session),
+    db: DBDep,
 ):
-    # Проверяем, не занят ли email
+    # Проверяем, не заняты ли email и nickname (одним запросом)
     result = await db.execute(
-        select(User).where(User.email == user_data.email)
+        select(User.email, User.nickname).where(
+            or_(
+                User.email == user_data.email,
+                User.nickname == user_data.nickname,
+            )
+        )
     )
-    if result.scalar_one_or_none():
+    rows = result.all()
+
+    if any(row.email == user_data.email for row in rows):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email уже существует",
         )
 
-    # Проверяем, не занят ли nickname
-    result = await db.execute(
-        select(User).where(User.nickname == user_data.nickname)
-    )
-    if result.scalar_one_or_none():
+    if any(row.nickname == user_data.nickname for row in rows):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким никнеймом уже существует",
@@ -50,7 +51,7 @@ async def register(
     new_user = User(
         nickname=user_data.nickname,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         role=UserRole.USER,
     )
 
@@ -63,8 +64,8 @@ async def register(
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_async_session),
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    db: DBDep,
 ):
     # Ищем пользователя по email (username в форме = email)
     result = await db.execute(
@@ -73,7 +74,7 @@ async def login(
     user = result.scalar_one_or_none()
 
     # Проверяем пользователя и пароль
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
@@ -90,7 +91,7 @@ async def login(
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(
-    current_user: User = Depends(get_current_user),
+    current_user: UserDep,
 ):
     return current_user
 
@@ -99,50 +100,54 @@ async def get_me(
 async def change_password(
     old_password: str,
     new_password: str,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> Dict[str, str]:
     # Проверяем старый пароль
-    if not verify_password(old_password, current_user.hashed_password):
+    if not await verify_password_async(old_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Старый пароль указан неверно",
         )
 
     # Хешируем и сохраняем новый пароль
-    current_user.hashed_password = get_password_hash(new_password)
+    current_user.hashed_password = await get_password_hash_async(new_password)
     db.add(current_user)
     await db.commit()
     await db.refresh(current_user)
+    invalidate_user_cache(current_user.id)
 
     return {"message": "Пароль успешно изменён"}
 
 
 @router.get("/admin/users", response_model=List[dict])
 async def get_users_with_task_counts(
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> List[dict]:
     # Доступ только для админов
-    if current_user.role != UserRole.ADMIN:
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Доступ запрещён",
         )
 
-    # SELECT users.*, COUNT(tasks.id) AS task_count
-    # FROM users LEFT JOIN tasks ON tasks.user_id = users.id
-    # GROUP BY users.id;
-    stmt = (
-        select(
-            User.id,
-            User.nickname,
-            User.email,
-            User.role,
-            func.count(Task.id).label("task_count"),
-        )
-        .outerjoin(Task, Task.user_id == User.id)
-        .group_by(User.id)
+    # SELECT users.*,
+    #        (SELECT COUNT(tasks.id) FROM tasks WHERE tasks.user_id = users.id) AS task_count
+    # FROM users;
+    # Коррелированный подзапрос считается по индексу tasks(user_id)
+    task_count = (
+        select(func.count(Task.id))
+        .where(Task.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    stmt = select(
+        User.id,
+        User.nickname,
+        User.email,
+        User.role,
+        task_count.label("task_count"),
     )
 
     result = await db.execute(stmt)
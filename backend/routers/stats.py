@@ -1,11 +1,14 @@
+import functools
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import case, func, select
+from typing import Optional
 
-from dependencies import get_current_user
+from cachetools import TTLCache
+from fastapi import APIRouter
+from sqlalchemy import func, select
+
+from config import STATS_CACHE_MAXSIZE, STATS_CACHE_TTL
+from dependencies import DBDep, UserDep
 from models import Task
-from database import get_async_session
 from models.user import User
 from schemas import TimingStatsResponse
 
@@ -15,32 +18,107 @@ router = APIRouter(
     tags=["statistics"],
 )
 
+# Кэш ответов: (эндпоинт, id пользователя или None для админа) -> ответ.
+# Включается переменной окружения STATS_CACHE_TTL (в секундах).
+_stats_cache: Optional[TTLCache] = (
+    TTLCache(maxsize=STATS_CACHE_MAXSIZE, ttl=STATS_CACHE_TTL)
+    if STATS_CACHE_TTL > 0
+    else None
+)
+
+
+def _stats_scope(current_user: User) -> Optional[int]:
+    # админ видит статистику по всем задачам — общий ключ для всех админов
+    return None if current_user.is_admin else current_user.id
+
+
+def invalidate_stats_cache(user_id: Optional[int]) -> None:
+    """Сбрасывает статистику владельца задачи и общую статистику админов."""
+    if _stats_cache is None:
+        return
+    for key in list(_stats_cache.keys()):
+        if key[1] is None or key[1] == user_id:
+            _stats_cache.pop(key, None)
+
+
+def _cached_stats(handler):
+    # Кэширует ответ обработчика отдельно для каждого пользователя
+    @functools.wraps(handler)
+    async def wrapper(*, current_user: User, **kwargs):
+        if _stats_cache is None:
+            return await handler(current_user=current_user, **kwargs)
+
+        key = (handler.__name__, _stats_scope(current_user))
+        cached = _stats_cache.get(key)
+        if cached is None:
+            cached = await handler(current_user=current_user, **kwargs)
+            _stats_cache[key] = cached
+        return cached
+
+    return wrapper
+
+
+def _timing_columns(now_utc: datetime) -> list:
+    # count(*) FILTER (WHERE ...) в PostgreSQL: не передаём в агрегат
+    # неподходящие строки, и результат 0 вместо NULL на пустой выборке
+    return [
+        func.count().filter(
+            Task.completed.is_(True),
+            Task.completed_at <= Task.deadline_at,
+        ).label("completed_on_time"),
+        func.count().filter(
+            Task.completed.is_(True),
+            Task.completed_at > Task.deadline_at,
+        ).label("completed_late"),
+        func.count().filter(
+            Task.completed.is_(False),
+            Task.deadline_at.is_not(None),
+            Task.deadline_at > now_utc,
+        ).label("on_plan_pending"),
+        func.count().filter(
+            Task.completed.is_(False),
+            Task.deadline_at.is_not(None),
+            Task.deadline_at <= now_utc,
+        ).label("overdue_pending"),
+    ]
+
 
 @router.get("/", response_model=dict)
+@_cached_stats
 async def get_tasks_stats(
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> dict:
     # админ видит все задачи, пользователь — только свои
-    if current_user.role.value == "admin":
-        stmt = select(Task)
-    else:
-        stmt = select(Task).where(Task.user_id == current_user.id)
-
-    result = await db.execute(stmt)
-    tasks = result.scalars().all()
+    conditions = []
+    if not current_user.is_admin:
+        conditions.append(Task.user_id == current_user.id)
+
+    # считаем в БД через GROUP BY, а не поднимаем все задачи в память
+    q_rows = (
+        await db.execute(
+            select(Task.quadrant, func.count())
+            .where(*conditions)
+            .group_by(Task.quadrant)
+        )
+    ).all()
+    s_rows = (
+        await db.execute(
+            select(Task.completed, func.count())
+            .where(*conditions)
+            .group_by(Task.completed)
+        )
+    ).all()
 
-    total_tasks = len(tasks)
     by_quadrant = {"Q1": 0, "Q2": 0, "Q3": 0, "Q4": 0}
-    by_status = {"completed": 0, "pending": 0}
+    by_quadrant.update(
+        {quadrant: count for quadrant, count in q_rows if quadrant in by_quadrant}
+    )
+    total_tasks = sum(count for _, count in q_rows)
 
-    for task in tasks:
-        if task.quadrant in by_quadrant:
-            by_quadrant[task.quadrant] += 1
-        if task.completed:
-            by_status["completed"] += 1
-        else:
-            by_status["pending"] += 1
+    by_status = {"completed": 0, "pending": 0}
+    for completed, count in s_rows:
+        by_status["completed" if completed else "pending"] += count
 
     return {
         "total_tasks": total_tasks,
@@ -50,44 +128,36 @@ async def get_tasks_stats(
 
 
 @router.get("/deadlines", response_model=list[dict])
+@_cached_stats
 async def get_pending_deadlines(
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> list[dict]:
+    # Разность дат считается в БД (date - date = число дней), выбираем
+    # только нужные столбцы — без ORM-объектов и арифметики в Python
+    stmt = select(
+        Task.title,
+        Task.description,
+        Task.created_at,
+        (func.date(Task.deadline_at) - func.current_date()).label("days_left"),
+    ).where(
+        Task.completed.is_(False),
+        Task.deadline_at.is_not(None),
+    )
+
     # фильтруем по user_id для обычного пользователя
-    if current_user.role.value == "admin":
-        stmt = select(Task).where(Task.completed.is_(False))
-    else:
-        stmt = select(Task).where(
-            Task.completed.is_(False),
-            Task.user_id == current_user.id,
-        )
+    if not current_user.is_admin:
+        stmt = stmt.where(Task.user_id == current_user.id)
 
     result = await db.execute(stmt)
-    tasks = result.scalars().all()
-
-    today = datetime.now().date()
-    data = []
-    for task in tasks:
-        if task.deadline_at is None:
-            continue
-
-        days_left = (task.deadline_at.date() - today).days
-        data.append(
-            {
-                "title": task.title,
-                "description": task.description,
-                "created_at": task.created_at,
-                "days_left": days_left,
-            }
-        )
-    return data
+    return [dict(row) for row in result.mappings()]
 
 
 @router.get("/timing", response_model=TimingStatsResponse)
+@_cached_stats
 async def get_deadline_stats(
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> TimingStatsResponse:
     """
     Статистика по срокам выполнения задач:
@@ -100,53 +170,10 @@ async def get_deadline_stats(
     base_conditions = []
 
     # добавляем ограничение по пользователю для не-админа
-    if current_user.role.value != "admin":
+    if not current_user.is_admin:
         base_conditions.append(Task.user_id == current_user.id)
 
-    statement = select(
-        func.sum(
-            case(
-                (
-                    (Task.completed == True) &
-                    (Task.completed_at <= Task.deadline_at),
-                    1,
-                ),
-                else_=0,
-            )
-        ).label("completed_on_time"),
-        func.sum(
-            case(
-                (
-                    (Task.completed == True) &
-                    (Task.completed_at > Task.deadline_at),
-                    1,
-                ),
-                else_=0,
-            )
-        ).label("completed_late"),
-        func.sum(
-            case(
-                (
-                    (Task.completed == False) &
-                    (Task.deadline_at != None) &
-                    (Task.deadline_at > now_utc),
-                    1,
-                ),
-                else_=0,
-            )
-        ).label("on_plan_pending"),
-        func.sum(
-            case(
-                (
-                    (Task.completed == False) &
-                    (Task.deadline_at != None) &
-                    (Task.deadline_at <= now_utc),
-                    1,
-                ),
-                else_=0,
-            )
-        ).label("overdue_pending"),
-    ).select_from(Task)
+    statement = select(*_timing_columns(now_utc)).select_from(Task)
 
     # если есть условия по пользователю — добавляем в where
     if base_conditions:
@@ -156,10 +183,59 @@ async def get_deadline_stats(
     stats_row = result.one()
 
     return TimingStatsResponse(
-        completed_on_time=stats_row.completed_on_time or 0,
-        completed_late=stats_row.completed_late or 0,
-        on_plan_pending=stats_row.on_plan_pending or 0,
-        overtime_pending=stats_row.overdue_pending or 0,
+        completed_on_time=stats_row.completed_on_time,
+        completed_late=stats_row.completed_late,
+        on_plan_pending=stats_row.on_plan_pending,
+        overtime_pending=stats_row.overdue_pending,
     )
 
 
+@router.get("/overview", response_model=dict)
+@_cached_stats
+async def get_stats_overview(
+    db: DBDep,
+    current_user: UserDep,
+) -> dict:
+    """
+    Сводка для дашборда: данные /stats и /stats/timing
+    одним запросом к БД
+    """
+
+    now_utc = datetime.now(timezone.utc)
+
+    statement = select(
+        func.count().label("total_tasks"),
+        func.count().filter(Task.quadrant == "Q1").label("q1"),
+        func.count().filter(Task.quadrant == "Q2").label("q2"),
+        func.count().filter(Task.quadrant == "Q3").label("q3"),
+        func.count().filter(Task.quadrant == "Q4").label("q4"),
+        func.count().filter(Task.completed.is_(True)).label("completed"),
+        func.count().filter(Task.completed.is_(False)).label("pending"),
+        *_timing_columns(now_utc),
+    ).select_from(Task)
+
+    if not current_user.is_admin:
+        statement = statement.where(Task.user_id == current_user.id)
+
+    result = await db.execute(statement)
+    row = result.one()
+
+    return {
+        "total_tasks": row.total_tasks,
+        "by_quadrant": {
+            "Q1": row.q1,
+            "Q2": row.q2,
+            "Q3": row.q3,
+            "Q4": row.q4,
+        },
+        "by_status": {
+            "completed": row.completed,
+            "pending": row.pending,
+        },
+        "timing": {
+            "completed_on_time": row.completed_on_time,
+            "completed_late": row.completed_late,
+            "on_plan_pending": row.on_plan_pending,
+            "overtime_pending": row.overdue_pending,
+        },
+    }
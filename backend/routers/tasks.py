@@ -1,15 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query, status
-from typing import List
-from datetime import datetime
-from dependencies import get_current_user
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Annotated, AsyncIterator, List, NoReturn
+from datetime import datetime, time, timedelta, timezone
+from dependencies import DBDep, UserDep
 from models.user import User
 from schemas import TaskCreate, TaskUpdate, TaskResponse
-from database import get_async_session
-from models.tasks import Task
-from utils import calc_quadrant
-from fastapi import Depends
-from sqlalchemy import select
+from database import AsyncSessionLocal
+from models.tasks import Task, TASK_SEARCH_TEXT
+from routers.stats import invalidate_stats_cache
+from utils import calc_quadrant, is_urgent_from_deadline, today_utc
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 from sqlalchemy.sql import func
 
 
@@ -19,57 +22,173 @@ router = APIRouter(
     responses={404: {"description": "Task not found"}},
 )
 
+# Запрещаем ленивую подгрузку связей при выборке задач: случайный N+1
+# сразу падает с ошибкой. Нужные связи подгружать явно через selectinload.
+TASK_LOAD_OPTS = (raiseload("*"),)
+
+# Максимальное количество задач в одном запросе POST /tasks/bulk
+BULK_CREATE_LIMIT = 1000
+
+# Сколько строк за раз читается из курсора при потоковой отдаче списка задач
+STREAM_CHUNK_SIZE = 1000
+
+# Поля TaskResponse, которые берутся из строки Task
+_TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+
+
+def _access_conditions(current_user: User) -> list:
+    # Админ имеет доступ ко всем задачам, пользователь — только к своим
+    if current_user.is_admin:
+        return []
+    return [Task.user_id == current_user.id]
+
+
+async def _raise_not_found_or_forbidden(db: AsyncSession, task_id: int) -> NoReturn:
+    # Запрос не затронул ни одной строки: выясняем, нет задачи или нет доступа
+    result = await db.execute(
+        select(Task.id).where(Task.id == task_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Задача не найдена",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Нет доступа к этой задаче",
+    )
+
+
+def _task_json(task: Task) -> dict:
+    # Данные из БД уже корректны: собираем модель без валидации
+    return TaskResponse.model_construct(
+        **{name: getattr(task, name) for name in _TASK_RESPONSE_FIELDS}
+    ).model_dump(mode="json")
+
+
+def _tasks_json_response(tasks) -> ORJSONResponse:
+    # Готовый Response FastAPI отдаёт как есть, не проверяя его повторно по response_model
+    return ORJSONResponse([_task_json(task) for task in tasks])
+
+
+async def _stream_tasks_json(stmt) -> AsyncIterator[bytes]:
+    # Отдельная сессия: сессия из Depends закрывается до отправки тела ответа
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(
+            stmt.execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        yield b"["
+        first = True
+        async for partition in result.partitions():
+            chunk = b",".join(
+                orjson.dumps(_task_json(task))
+                for task in partition
+            )
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]"
+
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task: TaskCreate,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> TaskResponse:
-    # Определяем квадрант
-    quadrant = calc_quadrant(task.is_important, task.deadline_at)
-
-    new_task = Task(
-        title=task.title,
-        description=task.description,
-        is_important=task.is_important,
-        quadrant=quadrant,
-        deadline_at=task.deadline_at,
-        completed=False,
-        user_id=current_user.id,
-    )
+    # Определяем срочность и квадрант
+    today = today_utc()
+    is_urgent = is_urgent_from_deadline(task.deadline_at, today)
+    quadrant = calc_quadrant(task.is_important, task.deadline_at, today)
 
-    db.add(new_task)
+    # INSERT ... RETURNING: строка со всеми полями возвращается тем же запросом
+    result = await db.execute(
+        insert(Task)
+        .values(
+            title=task.title,
+            description=task.description,
+            is_important=task.is_important,
+            is_urgent=is_urgent,
+            quadrant=quadrant,
+            deadline_at=task.deadline_at,
+            completed=False,
+            user_id=current_user.id,
+        )
+        .returning(Task)
+    )
+    new_task = result.scalar_one()
     await db.commit()
-    await db.refresh(new_task)
+    invalidate_stats_cache(current_user.id)
 
     return new_task
 
 
+@router.post("/bulk", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+    tasks: List[TaskCreate],
+    db: DBDep,
+    current_user: UserDep,
+) -> List[TaskResponse]:
+    if len(tasks) > BULK_CREATE_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Можно создать не более {BULK_CREATE_LIMIT} задач за один запрос",
+        )
+    if not tasks:
+        return []
+
+    today = today_utc()
+    rows = [
+        {
+            "title": task.title,
+            "description": task.description,
+            "is_important": task.is_important,
+            "is_urgent": is_urgent_from_deadline(task.deadline_at, today),
+            "quadrant": calc_quadrant(task.is_important, task.deadline_at, today),
+            "deadline_at": task.deadline_at,
+            "completed": False,
+            "user_id": current_user.id,
+        }
+        for task in tasks
+    ]
+
+    # Один INSERT ... VALUES (...), (...) RETURNING на пачку строк (insertmanyvalues)
+    result = await db.execute(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        rows,
+    )
+    new_tasks = result.scalars().all()
+    await db.commit()
+    invalidate_stats_cache(current_user.id)
+
+    return new_tasks
+
+
 @router.get("", response_model=List[TaskResponse])
 async def get_all_tasks(
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> List[TaskResponse]:
-    # Если пользователь - admin, показываем все задачи
-    if current_user.role.value == "admin":
-        result = await db.execute(select(Task))
-    else:
-        # Обычные пользователи видят только свои задачи
-        result = await db.execute(
-            select(Task).where(Task.user_id == current_user.id)
+    # Если пользователь - admin, показываем все задачи.
+    # Таблица может быть большой, поэтому отдаём их потоком, а не списком в памяти
+    if current_user.is_admin:
+        return StreamingResponse(
+            _stream_tasks_json(select(Task).options(*TASK_LOAD_OPTS)),
+            media_type="application/json",
         )
 
-    tasks = result.scalars().all()
+    # Обычные пользователи видят только свои задачи
+    result = await db.execute(
+        select(Task).options(*TASK_LOAD_OPTS).where(Task.user_id == current_user.id)
+    )
 
-    return tasks
+    return _tasks_json_response(result.scalars())
 
 
 @router.get("/quadrant/{quadrant}", response_model=List[TaskResponse])
 async def get_tasks_by_quadrant(
     quadrant: str,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> List[TaskResponse]:
     """Получить задачи пользователя по квадрату"""
 
@@ -80,27 +199,26 @@ async def get_tasks_by_quadrant(
         )
 
     # Администраторы видят все, пользователи - только свои
-    if current_user.role.value == "admin":
+    if current_user.is_admin:
         result = await db.execute(
-            select(Task).where(Task.quadrant == quadrant)
+            select(Task).options(*TASK_LOAD_OPTS).where(Task.quadrant == quadrant)
         )
     else:
         result = await db.execute(
-            select(Task).where(
+            select(Task).options(*TASK_LOAD_OPTS).where(
                 Task.quadrant == quadrant,
                 Task.user_id == current_user.id,
             )
         )
 
-    tasks = result.scalars().all()
-    return tasks
+    return _tasks_json_response(result.scalars())
 
 
 @router.get("/status/{status}", response_model=List[TaskResponse])
 async def get_tasks_by_status(
     status: str,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> List[TaskResponse]:
     if status not in ["completed", "pending"]:
         raise HTTPException(
@@ -110,80 +228,73 @@ async def get_tasks_by_status(
 
     is_completed = status == "completed"
 
-    if current_user.role.value == "admin":
+    if current_user.is_admin:
         result = await db.execute(
-            select(Task).where(Task.completed == is_completed)
+            select(Task).options(*TASK_LOAD_OPTS).where(Task.completed == is_completed)
         )
     else:
         result = await db.execute(
-            select(Task).where(
+            select(Task).options(*TASK_LOAD_OPTS).where(
                 Task.completed == is_completed,
                 Task.user_id == current_user.id,
             )
         )
 
-    tasks = result.scalars().all()
-    return tasks
+    return _tasks_json_response(result.scalars())
 
 
 @router.get("/search", response_model=List[TaskResponse])
 async def search_tasks(
-    q: str = Query(..., min_length=2),
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    q: Annotated[str, Query(min_length=2)],
+    db: DBDep,
+    current_user: UserDep,
 ) -> List[TaskResponse]:
-    keyword = f"%{q.lower()}%"
+    # Экранируем спецсимволы LIKE, чтобы "%" и "_" в запросе искались буквально
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    keyword = f"%{escaped}%"
 
-    if current_user.role.value == "admin":
+    if current_user.is_admin:
         result = await db.execute(
-            select(Task).where(
-                Task.title.ilike(keyword)
-                | Task.description.ilike(keyword)
+            select(Task).options(*TASK_LOAD_OPTS).where(
+                TASK_SEARCH_TEXT.ilike(keyword, escape="\\")
             )
         )
     else:
         result = await db.execute(
-            select(Task).where(
+            select(Task).options(*TASK_LOAD_OPTS).where(
                 Task.user_id == current_user.id,
-                Task.title.ilike(keyword)
-                | Task.description.ilike(keyword),
+                TASK_SEARCH_TEXT.ilike(keyword, escape="\\"),
             )
         )
 
-    tasks = result.scalars().all()
-    if not tasks:
-        raise HTTPException(
-            status_code=404,
-            detail="По данному запросу ничего не найдено",
-        )
-
-    return tasks
+    return _tasks_json_response(result.scalars())
 
 
 @router.get("/today", response_model=List[TaskResponse])
 async def get_tasks_due_today(
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: DBDep,
+    current_user: UserDep,
 ) -> List[TaskResponse]:
-    today = datetime.utcnow().date()  # текущая дата в UTC
+    today = today_utc()  # текущая дата в UTC
+
+    # Полуоткрытый интервал [начало дня; начало следующего дня) в UTC —
+    # в отличие от date(deadline_at) позволяет использовать индекс по deadline_at
+    start = datetime.combine(today, time.min, tzinfo=timezone.utc)
+    end = start + timedelta(days=1)
 
     # Админ видит все задачи на сегодня, пользователь — только свои
-    if current_user.role.value == "admin":
-        stmt = select(Task).where(func.date(Task.deadline_at) == today)
-    else:
-        stmt = select(Task).where(
-            func.date(Task.deadline_at) == today,
-            Task.user_id == current_user.id,
-        )
+    stmt = select(Task).options(*TASK_LOAD_OPTS).where(
+        Task.deadline_at >= start,
+        Task.deadline_at < end,
+        *_access_conditions(current_user),
+    )
 
     result = await db.execute(stmt)
     tasks = result.scalars().all()
 
-    if not tasks:
-        raise HTTPException(
-            status_code=404,
-            detail="На сегодня задач не найдено",
-        )
+    # Пустой список — нормальный ответ; разрешаем клиенту кэшировать его ненадолго
+    response.headers["Cache-Control"] = "private, max-age=30"
 
     return tasks
 
@@ -191,25 +302,19 @@ async def get_tasks_due_today(
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task_by_id(
     task_id: int,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> TaskResponse:
     result = await db.execute(
-        select(Task).where(Task.id == task_id)
+        select(Task).options(*TASK_LOAD_OPTS).where(
+            Task.id == task_id,
+            *_access_conditions(current_user),
+        )
     )
     task = result.scalar_one_or_none()
 
     if not task:
-        raise HTTPException(
-            status_code=404,
-            detail="Задача не найдена",
-        )
-
-    if current_user.role.value != "admin" and task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Нет доступа к этой задаче",
-        )
+        await _raise_not_found_or_forbidden(db, task_id)
 
     return task
 
@@ -218,35 +323,34 @@ async def get_task_by_id(
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> TaskResponse:
+    update_data = task_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_task_by_id(task_id, db, current_user)
+
+    # UPDATE ... RETURNING: права доступа проверяются прямо в WHERE
     result = await db.execute(
-        select(Task).where(Task.id == task_id)
+        update(Task)
+        .where(Task.id == task_id, *_access_conditions(current_user))
+        .values(**update_data)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
     )
     task = result.scalar_one_or_none()
 
     if not task:
-        raise HTTPException(
-            status_code=404,
-            detail="Задача не найдена",
-        )
-    # Проверка прав доступа
-    if current_user.role.value != "admin" and task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Нет доступа к этой задаче",
-        )
-    update_data = task_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
+        await _raise_not_found_or_forbidden(db, task_id)
 
     # Пересчитываем срочность и квадрант
     if "is_important" in update_data or "deadline_at" in update_data:
-        task.quadrant = calc_quadrant(task.is_important, task.deadline_at)
+        today = today_utc()
+        task.is_urgent = is_urgent_from_deadline(task.deadline_at, today)
+        task.quadrant = calc_quadrant(task.is_important, task.deadline_at, today)
 
     await db.commit()
-    await db.refresh(task)
+    invalidate_stats_cache(task.user_id)
 
     return task
 
@@ -254,32 +358,23 @@ async def update_task(
 @router.patch("/{task_id}/complete", response_model=TaskResponse)
 async def complete_task(
     task_id: int,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> TaskResponse:
     result = await db.execute(
-        select(Task).where(Task.id == task_id)
+        update(Task)
+        .where(Task.id == task_id, *_access_conditions(current_user))
+        .values(completed=True, completed_at=func.now())
+        .returning(Task)
+        .execution_options(synchronize_session=False)
     )
     task = result.scalar_one_or_none()
 
     if not task:
-        raise HTTPException(
-            status_code=404,
-            detail="Задача не найдена",
-        )
-
-    # Проверка прав доступа
-    if current_user.role.value != "admin" and task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Нет доступа к этой задаче",
-        )
-
-    task.completed = True
-    task.completed_at = datetime.now()
+        await _raise_not_found_or_forbidden(db, task_id)
 
     await db.commit()
-    await db.refresh(task)
+    invalidate_stats_cache(task.user_id)
 
     return task
 
@@ -287,39 +382,25 @@ async def complete_task(
 @router.delete("/{task_id}", status_code=status.HTTP_200_OK)
 async def delete_task(
     task_id: int,
-    db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
+    db: DBDep,
+    current_user: UserDep,
 ) -> dict:
     result = await db.execute(
-        select(Task).where(Task.id == task_id)
+        delete(Task)
+        .where(Task.id == task_id, *_access_conditions(current_user))
+        .returning(Task.id, Task.title, Task.user_id)
+        .execution_options(synchronize_session=False)
     )
-    task = result.scalar_one_or_none()
+    deleted_task_info = result.one_or_none()
 
-    if not task:
-        raise HTTPException(
-            status_code=404,
-            detail="Задача не найдена",
-        )
-
-    # Проверка прав доступа
-    if current_user.role.value != "admin" and task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Нет доступа к этой задаче",
-        )
-
-    deleted_task_info = {
-        "id": task.id,
-        "title": task.title,
-    }
+    if not deleted_task_info:
+        await _raise_not_found_or_forbidden(db, task_id)
 
-    await db.delete(task)
     await db.commit()
+    invalidate_stats_cache(deleted_task_info.user_id)
 
     return {
         "message": "Задача успешно удалена",
-        "id": deleted_task_info["id"],
-        "title": deleted_task_info["title"],
+        "id": deleted_task_info.id,
+        "title": deleted_task_info.title,
     }
-
-
@@ -3,27 +3,35 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from database import AsyncSessionLocal
 from models import Task
-from utils import calc_quadrant, is_urgent_from_deadline
+from utils import calc_quadrant, is_urgent_from_deadline, today_utc
 from datetime import datetime
 
+# Сколько задач за раз читается из курсора при пересчете срочности
+URGENCY_CHUNK_SIZE = 1000
+
 
 async def update_task_urgency():
     print(f"[{datetime.now()}] Запуск автоматического обновления срочности задач...")
 
     async with AsyncSessionLocal() as db:
         try:
-            # Получаем все незавершенные задачи
-            result = await db.execute(
-                select(Task).where(Task.completed == False)
+            # Читаем незавершенные задачи порциями через серверный курсор,
+            # а не поднимаем всю таблицу в память
+            result = await db.stream_scalars(
+                select(Task)
+                .where(Task.completed == False)
+                .execution_options(yield_per=URGENCY_CHUNK_SIZE)
             )
-            tasks = result.scalars().all()
 
+            checked_count = 0
             updated_count = 0
+            today = today_utc()
 
-            for task in tasks:
+            async for task in result:
+                checked_count += 1
                 # Вычисляем новую срочность
-                new_urgency = is_urgent_from_deadline(task.deadline_at)
-                new_quadrant = calc_quadrant(task.is_important, task.deadline_at)
+                new_urgency = is_urgent_from_deadline(task.deadline_at, today)
+                new_quadrant = calc_quadrant(task.is_important, task.deadline_at, today)
 
                 # Обновляем, только если значения изменились
                 if task.is_urgent != new_urgency or task.quadrant != new_quadrant:
@@ -33,9 +41,9 @@ async def update_task_urgency():
 
             if updated_count > 0:
                 await db.commit()
-                print(f"Обновлено задач: {updated_count} из {len(tasks)}")
+                print(f"Обновлено задач: {updated_count} из {checked_count}")
             else:
-                print(f"Изменений не требуется. Проверено задач: {len(tasks)}")
+                print(f"Изменений не требуется. Проверено задач: {checked_count}")
 
         except Exception as e:
             print(f"Ошибка при обновлении срочности: {e}")
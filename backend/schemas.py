@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, computed_field
 from typing import Optional
 from datetime import datetime
-from utils import is_urgent_from_deadline
+from utils import is_urgent_from_deadline, today_utc
 
 # Базовая схема для Task.
 # Все поля, которые есть в нашей "базе данных" tasks_db
@@ -93,7 +93,7 @@ class TaskResponse(TaskBase):
     def days_left(self) -> int:
         if self.deadline_at is None:
             return None
-        return (self.deadline_at.date() - datetime.utcnow().date()).days
+        return (self.deadline_at.date() - today_utc()).days
 
     @computed_field
     @property
@@ -1,22 +1,37 @@
-from datetime import datetime
+import time
+from datetime import date, datetime, timezone
+from typing import Optional
 
+# Кэш текущей даты в UTC: [дата, timestamp начала следующих суток]
+_today_cache: list = [None, 0.0]
 
-def is_urgent_from_deadline(deadline_at: datetime) -> bool:
+
+def today_utc() -> date:
+    """Текущая дата в UTC; пересчитывается только при смене суток."""
+    now = time.time()
+    if now >= _today_cache[1]:
+        _today_cache[0] = datetime.fromtimestamp(now, timezone.utc).date()
+        _today_cache[1] = (now // 86400 + 1) * 86400
+    return _today_cache[0]
+
+
+def is_urgent_from_deadline(deadline_at: datetime, today: Optional[date] = None) -> bool:
     if deadline_at is None:
         return False
-    days_left = (deadline_at.date() - datetime.utcnow().date()).days
+    if today is None:
+        today = today_utc()
+    days_left = (deadline_at.date() - today).days
     return days_left <= 3
 
 
-def calc_quadrant(is_important: bool, deadline_at: datetime) -> str:
-    urgent = is_urgent_from_deadline(deadline_at)
-    if is_important and urgent:
-        return "Q1"
-    elif is_important and not urgent:
-        return "Q2"
-    elif not is_important and urgent:
-        return "Q3"
-    else:
-        return "Q4"
+# Квадрант по индексу (важность << 1) | срочность
+_QUADRANTS = ("Q4", "Q3", "Q2", "Q1")
 
 
+def calc_quadrant(
+    is_important: bool,
+    deadline_at: datetime,
+    today: Optional[date] = None,
+) -> str:
+    urgent = is_urgent_from_deadline(deadline_at, today)
+    return _QUADRANTS[(is_important << 1) | urgent]
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Dict, List, Optional
 
 import httpx
@@ -13,11 +14,29 @@ class ApiClient:
 
     def __init__(self) -> None:
         self.base_url = API_BASE_URL.rstrip("/")
-        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=10.0)
+        # HTTP/2 (если сервер его поддерживает) и явные лимиты пула соединений
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(10.0, connect=2.0),
+        )
 
     async def close(self) -> None:
         await self._client.aclose()
 
+    async def warm_up(self) -> None:
+        """
+        Открывает соединение с backend заранее (GET /health),
+        чтобы первый запрос пользователя не тратил время на установку соединения.
+        """
+        health_url = self._client.base_url.copy_with(path="/health")
+        try:
+            await self._client.get(health_url)
+        except httpx.HTTPError:
+            # backend ещё не поднялся — соединение откроется при первом запросе
+            pass
+
     # ---------- Аутентификация ----------
     async def register_user(
         self,
@@ -129,17 +148,11 @@ class ApiClient:
 
     async def tasks_today(self, token: str) -> List[Dict[str, Any]]:
         """
-        Возвращает задачи на сегодня.
-        Если backend отвечает 404 (нет задач), возвращает пустой список.
+        Возвращает задачи на сегодня (пустой список, если задач нет).
         """
         headers = {"Authorization": f"Bearer {token}"}
-        try:
-            resp = await self._client.get("/tasks/today", headers=headers)
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return []
-            raise
+        resp = await self._client.get("/tasks/today", headers=headers)
+        resp.raise_for_status()
         return resp.json()
 
     async def search_tasks(self, token: str, query: str) -> List[Dict[str, Any]]:
@@ -155,4 +168,14 @@ class ApiClient:
         resp.raise_for_status()
         return resp.json()
 
-
+    async def dashboard(self, token: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Загружает список задач, задачи на сегодня и дедлайны параллельно:
+        три запроса занимают время одного, а не трёх последовательных.
+        """
+        tasks, today, deadlines = await asyncio.gather(
+            self.list_tasks(token),
+            self.tasks_today(token),
+            self.get_deadlines(token),
+        )
+        return {"tasks": tasks, "today": today, "deadlines": deadlines}
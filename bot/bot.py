@@ -1,10 +1,12 @@
 import asyncio
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import heapq
 import re
 
-from aiogram import Bot, Dispatcher, F, Router
+from aiogram import BaseMiddleware, Bot, Dispatcher, F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -47,36 +49,138 @@ class EditTaskStates(StatesGroup):
     deadline = State()
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSession:
     access_token: str
     email: str
 
 
+class LRUDict(OrderedDict):
+    """
+    Словарь ограниченного размера: при переполнении удаляется запись,
+    к которой дольше всего не обращались.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+
+# Максимальное количество пользователей, данные которых бот держит в памяти
+MAX_SESSIONS = 10_000
+
 # Память сессий бота в памяти процесса: chat_id -> UserSession
-SESSIONS: Dict[int, UserSession] = {}
+SESSIONS: Dict[int, UserSession] = LRUDict(MAX_SESSIONS)
 
 # Сдвиг часового пояса пользователя относительно UTC, в часах: chat_id -> offset
-TIMEZONE_OFFSETS: Dict[int, int] = {}
+TIMEZONE_OFFSETS: Dict[int, int] = LRUDict(MAX_SESSIONS)
+
+# Объекты часовых поясов для всех допустимых сдвигов (от -12 до +14 часов): offset -> tzinfo
+_TZ_BY_OFFSET: Dict[int, timezone] = {
+    offset: timezone(timedelta(hours=offset)) for offset in range(-12, 15)
+}
 
 # Время последней отправки напоминания для каждого пользователя: chat_id -> datetime
-LAST_REMINDER_SENT: Dict[int, datetime] = {}
+LAST_REMINDER_SENT: Dict[int, datetime] = LRUDict(MAX_SESSIONS)
+
+# Очередь проверок напоминаний: (время следующей проверки, chat_id), ближайшая — сверху
+_REMINDER_HEAP: List[Tuple[datetime, int]] = []
+# chat_id, уже стоящие в очереди (чтобы повторный вход не добавлял дубликат)
+_REMINDER_QUEUED: Set[int] = set()
+
+# Максимальный интервал между проверками напоминаний, в секундах
+REMINDER_POLL_INTERVAL = 300
+
+# Сколько пользователей проверяется одновременно
+REMINDER_CONCURRENCY = 16
+
+# Минимальный интервал между напоминаниями одному пользователю
+_REMINDER_INTERVAL = timedelta(hours=24)
+# Через сколько повторить проверку, если напоминать не о чем или backend недоступен
+_REMINDER_RETRY = timedelta(seconds=REMINDER_POLL_INTERVAL)
+
+
+class StripTextMiddleware(BaseMiddleware):
+    """
+    Один раз обрезает пробелы в тексте сообщения и передаёт результат
+    в обработчики аргументом text.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        data["text"] = (event.text or "").strip()
+        return await handler(event, data)
 
 
 router = Router()
+router.message.middleware(StripTextMiddleware())
 api_client = ApiClient()
 
+# Текст приветствия и справки для /start и /help
+_HELP_TEXT = (
+    "Привет! Я бот для управления задачами.\n\n"
+    "Доступные команды:\n"
+    "/help - помощь\n"
+    "/register - регистрация\n"
+    "/login - вход\n"
+    "/logout - выйти\n"
+    "/timezone <сдвиг> - установить часовой пояс (например, /timezone +3)\n"
+    "/change_password - смена пароля\n"
+    "/me - информация о текущем пользователе\n"
+    "/tasks - список задач\n"
+    "/today - задачи на сегодня\n"
+    "/search <текст> - поиск задач\n"
+    "/newtask - создать задачу\n"
+    "/edittask - изменить задачу\n"
+    "/complete <id> - завершить задачу\n"
+    "/delete <id> - удалить задачу\n"
+)
+
+# Простая проверка формата email
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Дедлайн в формате "YYYY-MM-DD HH:MM" с ведущими нулями
+_DEADLINE_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$")
+
+
+def _parse_deadline(text: str) -> datetime:
+    """Разбирает дедлайн в формате "YYYY-MM-DD HH:MM" (ValueError при неверном вводе)."""
+    # Обычный ввод с ведущими нулями разбираем быстрым fromisoformat (на C);
+    # остальное (например, "2025-1-5 9:30") — как раньше, через strptime
+    if _DEADLINE_RE.match(text):
+        return datetime.fromisoformat(text)
+    return datetime.strptime(text, "%Y-%m-%d %H:%M")
+
 
 def _get_utc_offset_hours(chat_id: int) -> int:
     """Возвращает сдвиг часового пояса для чата в часах (по умолчанию +3)."""
     return TIMEZONE_OFFSETS.get(chat_id, 3)
 
 
+def _get_tz(chat_id: int) -> timezone:
+    """Возвращает заранее созданный tzinfo для часового пояса чата."""
+    return _TZ_BY_OFFSET[_get_utc_offset_hours(chat_id)]
+
+
 def _local_to_utc(chat_id: int, dt_local: datetime) -> datetime:
     """Преобразует локальное время пользователя в UTC с учетом сохранённого сдвига."""
-    offset = _get_utc_offset_hours(chat_id)
-    dt_utc = dt_local - timedelta(hours=offset)
-    return dt_utc.replace(tzinfo=timezone.utc)
+    return dt_local.replace(tzinfo=_get_tz(chat_id)).astimezone(timezone.utc)
 
 
 def _utc_to_local(chat_id: int, dt_utc: datetime) -> datetime:
@@ -85,33 +189,60 @@ def _utc_to_local(chat_id: int, dt_utc: datetime) -> datetime:
         return None
     if dt_utc.tzinfo is None:
         dt_utc = dt_utc.replace(tzinfo=timezone.utc)
-    offset = _get_utc_offset_hours(chat_id)
-    return dt_utc + timedelta(hours=offset)
+    return dt_utc.astimezone(_get_tz(chat_id))
 
 
-def _format_task(task: dict, chat_id: int) -> str:
-    raw_deadline = task.get("deadline_at")
-    if raw_deadline:
+def _format_task_into(task: dict, chat_id: int, out: List[str]) -> None:
+    """Дописывает текстовое представление задачи в общий буфер out."""
+    g = task.get
+    raw_deadline = g("deadline_at")
+    if not raw_deadline:
+        deadline_str = "без дедлайна"
+    else:
         try:
             dt_utc = datetime.fromisoformat(raw_deadline)
             dt_local = _utc_to_local(chat_id, dt_utc)
-            deadline_str = dt_local.strftime("%Y-%m-%d %H:%M")
+            deadline_str = (
+                f"{dt_local.year:04d}-{dt_local.month:02d}-{dt_local.day:02d} "
+                f"{dt_local.hour:02d}:{dt_local.minute:02d}"
+            )
         except Exception:
             deadline_str = str(raw_deadline)
-    else:
-        deadline_str = "без дедлайна"
 
-    status = "✅" if task.get("completed") else "⏳"
-    quadrant = task.get("quadrant", "?")
-    return (
-        f"ID: {task.get('id')} {status}\n"
-        f"Название: {task.get('title')}\n"
-        f"Описание: {task.get('description') or '-'}\n"
-        f"Квадрант: {quadrant}\n"
+    status = "✅" if g("completed") else "⏳"
+    out.append(
+        f"ID: {g('id')} {status}\n"
+        f"Название: {g('title')}\n"
+        f"Описание: {g('description') or '-'}\n"
+        f"Квадрант: {g('quadrant', '?')}\n"
         f"Дедлайн (локальное время): {deadline_str}\n"
     )
 
 
+def _format_task(task: dict, chat_id: int) -> str:
+    parts: List[str] = []
+    _format_task_into(task, chat_id, parts)
+    return "".join(parts)
+
+
+def _format_task_list(header: str, tasks: List[dict], chat_id: int) -> str:
+    """Собирает заголовок и все задачи в один буфер и склеивает его один раз."""
+    parts = [header]
+    for i, task in enumerate(tasks):
+        if i:
+            parts.append("\n")
+        _format_task_into(task, chat_id, parts)
+    return "".join(parts)
+
+
+def _schedule_reminders(chat_id: int) -> None:
+    """Ставит пользователя в очередь проверки напоминаний (сразу же)."""
+    if chat_id in _REMINDER_QUEUED:
+        return
+    _REMINDER_QUEUED.add(chat_id)
+    heapq.heappush(_REMINDER_HEAP, (datetime.now(timezone.utc), chat_id))
+
+
 async def _require_session(message: Message) -> Optional[UserSession]:
     chat_id = message.chat.id
     session = SESSIONS.get(chat_id)
@@ -125,29 +256,12 @@ async def _require_session(message: Message) -> Optional[UserSession]:
 
 @router.message(Command("start"))
 async def cmd_start(message: Message) -> None:
-    await message.answer(
-        "Привет! Я бот для управления задачами.\n\n"
-        "Доступные команды:\n"
-        "/help - помощь\n"
-        "/register - регистрация\n"
-        "/login - вход\n"
-        "/logout - выйти\n"
-        "/timezone <сдвиг> - установить часовой пояс (например, /timezone +3)\n"
-        "/change_password - смена пароля\n"
-        "/me - информация о текущем пользователе\n"
-        "/tasks - список задач\n"
-        "/today - задачи на сегодня\n"
-        "/search <текст> - поиск задач\n"
-        "/newtask - создать задачу\n"
-        "/edittask - изменить задачу\n"
-        "/complete <id> - завершить задачу\n"
-        "/delete <id> - удалить задачу\n"
-    )
+    await message.answer(_HELP_TEXT)
 
 
 @router.message(Command("help"))
 async def cmd_help(message: Message) -> None:
-    await cmd_start(message)
+    await message.answer(_HELP_TEXT)
 
 
 @router.message(Command("timezone"))
@@ -192,17 +306,17 @@ async def cmd_register(message: Message, state: FSMContext) -> None:
 
 
 @router.message(RegisterStates.nickname)
-async def register_nickname(message: Message, state: FSMContext) -> None:
-    await state.update_data(nickname=message.text.strip())
+async def register_nickname(message: Message, state: FSMContext, text: str) -> None:
+    await state.update_data(nickname=text)
     await state.set_state(RegisterStates.email)
     await message.answer("Введите ваш email:")
 
 
 @router.message(RegisterStates.email)
-async def register_email(message: Message, state: FSMContext) -> None:
-    email = message.text.strip()
+async def register_email(message: Message, state: FSMContext, text: str) -> None:
+    email = text
     # Простая валидация email, чтобы не слать заведомо неверные данные на backend
-    if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email):
+    if not _EMAIL_RE.match(email):
         await message.answer("Некорректный email. Введите адрес в формате name@example.com:")
         return
 
@@ -212,11 +326,11 @@ async def register_email(message: Message, state: FSMContext) -> None:
 
 
 @router.message(RegisterStates.password)
-async def register_password(message: Message, state: FSMContext) -> None:
+async def register_password(message: Message, state: FSMContext, text: str) -> None:
     data = await state.get_data()
     nickname = data["nickname"]
     email = data["email"]
-    password = message.text.strip()
+    password = text
 
     try:
         await api_client.register_user(nickname=nickname, email=email, password=password)
@@ -239,17 +353,17 @@ async def cmd_login(message: Message, state: FSMContext) -> None:
 
 
 @router.message(LoginStates.email)
-async def login_email(message: Message, state: FSMContext) -> None:
-    await state.update_data(email=message.text.strip())
+async def login_email(message: Message, state: FSMContext, text: str) -> None:
+    await state.update_data(email=text)
     await state.set_state(LoginStates.password)
     await message.answer("Введите пароль:")
 
 
 @router.message(LoginStates.password)
-async def login_password(message: Message, state: FSMContext) -> None:
+async def login_password(message: Message, state: FSMContext, text: str) -> None:
     data = await state.get_data()
     email = data["email"]
-    password = message.text.strip()
+    password = text
 
     try:
         token = await api_client.login(email=email, password=password)
@@ -259,6 +373,7 @@ async def login_password(message: Message, state: FSMContext) -> None:
         return
 
     SESSIONS[message.chat.id] = UserSession(access_token=token, email=email)
+    _schedule_reminders(message.chat.id)
     await message.answer("Вы успешно авторизованы! Теперь можете управлять задачами.")
     await state.clear()
 
@@ -286,17 +401,17 @@ async def cmd_change_password(message: Message, state: FSMContext) -> None:
 
 
 @router.message(ChangePasswordStates.old_password)
-async def change_password_old(message: Message, state: FSMContext) -> None:
-    await state.update_data(old_password=message.text.strip())
+async def change_password_old(message: Message, state: FSMContext, text: str) -> None:
+    await state.update_data(old_password=text)
     await state.set_state(ChangePasswordStates.new_password)
     await message.answer("Введите новый пароль:")
 
 
 @router.message(ChangePasswordStates.new_password)
-async def change_password_new(message: Message, state: FSMContext) -> None:
+async def change_password_new(message: Message, state: FSMContext, text: str) -> None:
     data = await state.get_data()
     old_password = data["old_password"]
-    new_password = message.text.strip()
+    new_password = text
 
     session = await _require_session(message)
     if not session:
@@ -357,7 +472,7 @@ async def cmd_tasks(message: Message) -> None:
         await message.answer("У вас пока нет задач.")
         return
 
-    text = "Ваши задачи:\n\n" + "\n".join(_format_task(t, message.chat.id) for t in tasks)
+    text = _format_task_list("Ваши задачи:\n\n", tasks, message.chat.id)
     await message.answer(text)
 
 
@@ -377,7 +492,7 @@ async def cmd_today(message: Message) -> None:
         await message.answer("На сегодня задач нет.")
         return
 
-    text = "Задачи на сегодня:\n\n" + "\n".join(_format_task(t, message.chat.id) for t in tasks)
+    text = _format_task_list("Задачи на сегодня:\n\n", tasks, message.chat.id)
     await message.answer(text)
 
 
@@ -403,7 +518,7 @@ async def cmd_search(message: Message) -> None:
         await message.answer("Ничего не найдено.")
         return
 
-    text = "Результаты поиска:\n\n" + "\n".join(_format_task(t, message.chat.id) for t in tasks)
+    text = _format_task_list("Результаты поиска:\n\n", tasks, message.chat.id)
     await message.answer(text)
 
 
@@ -421,15 +536,15 @@ async def cmd_new_task(message: Message, state: FSMContext) -> None:
 
 
 @router.message(NewTaskStates.title)
-async def new_task_title(message: Message, state: FSMContext) -> None:
-    await state.update_data(title=message.text.strip())
+async def new_task_title(message: Message, state: FSMContext, text: str) -> None:
+    await state.update_data(title=text)
     await state.set_state(NewTaskStates.description)
     await message.answer("Введите описание задачи (или '-' если без описания):")
 
 
 @router.message(NewTaskStates.description)
-async def new_task_description(message: Message, state: FSMContext) -> None:
-    desc = message.text.strip()
+async def new_task_description(message: Message, state: FSMContext, text: str) -> None:
+    desc = text
     if desc == "-":
         desc = None
     await state.update_data(description=desc)
@@ -438,8 +553,8 @@ async def new_task_description(message: Message, state: FSMContext) -> None:
 
 
 @router.message(NewTaskStates.is_important)
-async def new_task_is_important(message: Message, state: FSMContext) -> None:
-    answer = message.text.strip().lower()
+async def new_task_is_important(message: Message, state: FSMContext, text: str) -> None:
+    answer = text.lower()
     is_important = answer in ("да", "yes", "y", "д")
     await state.update_data(is_important=is_important)
     await state.set_state(NewTaskStates.deadline)
@@ -453,20 +568,19 @@ async def new_task_is_important(message: Message, state: FSMContext) -> None:
 
 
 @router.message(NewTaskStates.deadline)
-async def new_task_deadline(message: Message, state: FSMContext) -> None:
+async def new_task_deadline(message: Message, state: FSMContext, text: str) -> None:
     session = await _require_session(message)
     if not session:
         await state.clear()
         return
 
-    text = message.text.strip()
     deadline_iso: Optional[str]
     if text == "-":
         deadline_iso = None
     else:
         try:
             # ожидаем формат "YYYY-MM-DD HH:MM" в ЛОКАЛЬНОМ времени пользователя
-            dt_local = datetime.strptime(text, "%Y-%m-%d %H:%M")
+            dt_local = _parse_deadline(text)
             dt_utc = _local_to_utc(message.chat.id, dt_local)
             deadline_iso = dt_utc.isoformat()
         except ValueError:
@@ -507,9 +621,9 @@ async def cmd_edit_task(message: Message, state: FSMContext) -> None:
 
 
 @router.message(EditTaskStates.task_id)
-async def edit_task_id(message: Message, state: FSMContext) -> None:
+async def edit_task_id(message: Message, state: FSMContext, text: str) -> None:
     try:
-        task_id = int(message.text.strip())
+        task_id = int(text)
     except ValueError:
         await message.answer("ID задачи должен быть числом. Попробуйте ещё раз.")
         return
@@ -522,8 +636,8 @@ async def edit_task_id(message: Message, state: FSMContext) -> None:
 
 
 @router.message(EditTaskStates.title)
-async def edit_task_title(message: Message, state: FSMContext) -> None:
-    title = message.text.strip()
+async def edit_task_title(message: Message, state: FSMContext, text: str) -> None:
+    title = text
     if title == "-":
         title = None
     await state.update_data(title=title)
@@ -534,8 +648,8 @@ async def edit_task_title(message: Message, state: FSMContext) -> None:
 
 
 @router.message(EditTaskStates.description)
-async def edit_task_description(message: Message, state: FSMContext) -> None:
-    desc = message.text.strip()
+async def edit_task_description(message: Message, state: FSMContext, text: str) -> None:
+    desc = text
     if desc == "-":
         desc = None
     await state.update_data(description=desc)
@@ -550,19 +664,18 @@ async def edit_task_description(message: Message, state: FSMContext) -> None:
 
 
 @router.message(EditTaskStates.deadline)
-async def edit_task_deadline(message: Message, state: FSMContext) -> None:
+async def edit_task_deadline(message: Message, state: FSMContext, text: str) -> None:
     session = await _require_session(message)
     if not session:
         await state.clear()
         return
 
-    text = message.text.strip()
     deadline_iso: Optional[str]
     if text == "-":
         deadline_iso = None
     else:
         try:
-            dt_local = datetime.strptime(text, "%Y-%m-%d %H:%M")
+            dt_local = _parse_deadline(text)
             dt_utc = _local_to_utc(message.chat.id, dt_local)
             deadline_iso = dt_utc.isoformat()
         except ValueError:
@@ -602,13 +715,14 @@ async def cmd_complete(message: Message) -> None:
     if not session:
         return
 
-    parts = message.text.split()
-    if len(parts) != 2:
+    parts = message.text.split(maxsplit=1)
+    arg = parts[1].strip() if len(parts) == 2 else ""
+    if not arg or any(ch.isspace() for ch in arg):
         await message.answer("Использование: /complete <ID задачи>")
         return
 
     try:
-        task_id = int(parts[1])
+        task_id = int(arg)
     except ValueError:
         await message.answer("ID задачи должен быть числом.")
         return
@@ -631,13 +745,14 @@ async def cmd_delete(message: Message) -> None:
     if not session:
         return
 
-    parts = message.text.split()
-    if len(parts) != 2:
+    parts = message.text.split(maxsplit=1)
+    arg = parts[1].strip() if len(parts) == 2 else ""
+    if not arg or any(ch.isspace() for ch in arg):
         await message.answer("Использование: /delete <ID задачи>")
         return
 
     try:
-        task_id = int(parts[1])
+        task_id = int(arg)
     except ValueError:
         await message.answer("ID задачи должен быть числом.")
         return
@@ -655,72 +770,125 @@ async def cmd_delete(message: Message) -> None:
 # ---------- Напоминания о дедлайнах ----------
 
 
+async def _check_reminders(bot: Bot, chat_id: int, session: UserSession, now: datetime) -> datetime:
+    """
+    Отправляет пользователю напоминание о задачах с дедлайном сегодня или завтра.
+    Возвращает время следующей проверки для этого пользователя.
+    """
+    # Проверяем, прошло ли 24 часа с последнего напоминания
+    last_sent = LAST_REMINDER_SENT.get(chat_id)
+    if last_sent and now - last_sent < _REMINDER_INTERVAL:
+        return last_sent + _REMINDER_INTERVAL
+
+    try:
+        deadlines = await api_client.get_deadlines(token=session.access_token)
+    except Exception:
+        # Если токен протух или backend недоступен — попробуем позже
+        return now + _REMINDER_RETRY
+
+    # Фильтруем задачи, у которых дедлайн сегодня или завтра
+    important_tasks = [
+        t
+        for t in deadlines
+        if isinstance(t.get("days_left"), int)
+        and -1 <= t["days_left"] <= 1
+    ]
+    if not important_tasks:
+        return now + _REMINDER_RETRY
+
+    text_lines = ["Напоминание о задачах с приближающимся дедлайном:"]
+    for t in important_tasks:
+        title = t.get("title")
+        days_left = t.get("days_left")
+        text_lines.append(f"• {title} — осталось дней: {days_left}")
+
+    await bot.send_message(chat_id=chat_id, text="\n".join(text_lines))
+    # Сохраняем время отправки напоминания
+    LAST_REMINDER_SENT[chat_id] = now
+    return now + _REMINDER_INTERVAL
+
+
 async def reminders_worker(bot: Bot) -> None:
     """
-    Периодически обходит авторизованных пользователей и напоминает
-    о задачах с приближающимся дедлайном (0-1 дней до дедлайна).
-    Напоминания отправляются не чаще одного раза в сутки для каждого пользователя.
+    Напоминает авторизованным пользователям о задачах с приближающимся
+    дедлайном (0-1 дней до дедлайна). Пользователи лежат в очереди с приоритетом
+    по времени следующей проверки, поэтому на каждом шаге обрабатываются только те,
+    чья очередь подошла. Напоминания отправляются не чаще одного раза в сутки.
     """
+    # Ограничиваем число одновременных запросов к backend и Telegram
+    semaphore = asyncio.Semaphore(REMINDER_CONCURRENCY)
+
+    async def check_one(chat_id: int, now: datetime) -> None:
+        async with semaphore:
+            # Сессию берём непосредственно перед проверкой: пока задача ждала
+            # семафор, пользователь мог выйти из аккаунта
+            session = SESSIONS.get(chat_id)
+            if session is None:
+                _REMINDER_QUEUED.discard(chat_id)
+                return
+            try:
+                next_check = await _check_reminders(bot, chat_id, session, now)
+            except Exception:
+                next_check = now + _REMINDER_RETRY
+        heapq.heappush(_REMINDER_HEAP, (next_check, chat_id))
+
     while True:
+        now = datetime.now(timezone.utc)
         try:
-            now = datetime.now(timezone.utc)
-            
-            for chat_id, session in list(SESSIONS.items()):
-                # Проверяем, прошло ли 24 часа с последнего напоминания
-                last_sent = LAST_REMINDER_SENT.get(chat_id)
-                if last_sent:
-                    time_since_last = now - last_sent
-                    if time_since_last < timedelta(hours=24):
-                        continue  # Ещё не прошло 24 часа, пропускаем
-                
-                try:
-                    deadlines = await api_client.get_deadlines(token=session.access_token)
-                except Exception:
-                    # Если токен протух или backend недоступен — просто пропускаем
-                    continue
-
-                # Фильтруем задачи, у которых дедлайн сегодня или завтра
-                important_tasks = [
-                    t
-                    for t in deadlines
-                    if isinstance(t.get("days_left"), int)
-                    and -1 <= t["days_left"] <= 1
-                ]
-                if not important_tasks:
-                    continue
-
-                text_lines = ["Напоминание о задачах с приближающимся дедлайном:"]
-                for t in important_tasks:
-                    title = t.get("title")
-                    days_left = t.get("days_left")
-                    text_lines.append(f"• {title} — осталось дней: {days_left}")
-
-                await bot.send_message(chat_id=chat_id, text="\n".join(text_lines))
-                # Сохраняем время отправки напоминания
-                LAST_REMINDER_SENT[chat_id] = now
+            due = []
+            while _REMINDER_HEAP and _REMINDER_HEAP[0][0] <= now:
+                _, chat_id = heapq.heappop(_REMINDER_HEAP)
+                due.append(chat_id)
+
+            # Проверяем всех, чья очередь подошла, параллельно
+            await asyncio.gather(
+                *(check_one(chat_id, now) for chat_id in due),
+                return_exceptions=True,
+            )
         except Exception:
             # Глобальная защита от падения цикла
             pass
 
-        # Проверяем раз в 5 минут
-        await asyncio.sleep(300)
+        # Спим до ближайшей проверки, но не дольше интервала опроса,
+        # чтобы вовремя подхватывать новых пользователей
+        delay = REMINDER_POLL_INTERVAL
+        if _REMINDER_HEAP:
+            until_next = (_REMINDER_HEAP[0][0] - datetime.now(timezone.utc)).total_seconds()
+            delay = min(delay, max(until_next, 1))
+        await asyncio.sleep(delay)
+
+
+async def on_startup() -> None:
+    # Прогреваем общий HTTP-клиент до первых сообщений пользователей
+    await api_client.warm_up()
+
+
+async def on_shutdown() -> None:
+    await api_client.close()
 
 
 async def main() -> None:
     bot = Bot(token=TELEGRAM_BOT_TOKEN)
     dp = Dispatcher()
     dp.include_router(router)
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
 
     # Запускаем фоновый воркер напоминаний
     asyncio.create_task(reminders_worker(bot))
 
-    try:
-        await dp.start_polling(bot)
-    finally:
-        await api_client.close()
+    await dp.start_polling(bot)
 
 
 if __name__ == "__main__":
+    # uvloop — более быстрый event loop (Linux/macOS); на Windows работаем на стандартном
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
 
 
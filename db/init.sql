@@ -36,6 +36,16 @@ CREATE TABLE IF NOT EXISTS tasks (
 );
 
 CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks (user_id);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_deadline ON tasks (user_id, deadline_at);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_quadrant ON tasks (user_id, quadrant);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_completed ON tasks (user_id, completed);
+CREATE INDEX IF NOT EXISTS ix_tasks_completed_deadline ON tasks (completed, deadline_at);
+CREATE INDEX IF NOT EXISTS ix_tasks_quadrant ON tasks (quadrant);
+
+-- Триграммный индекс для поиска по названию и описанию (ILIKE '%...%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_tasks_search_trgm
+    ON tasks USING gin ((title || ' ' || coalesce(description, '')) gin_trgm_ops);
 
 -- Демонстрационные данные для задач (user_id оставлен NULL, чтобы не требовать наличия пользователя)
 INSERT INTO tasks (title, description, is_important, is_urgent, quadrant, completed, deadline_at)